@@ -6,18 +6,45 @@ This is a script for simulating a wordle solution based on an answer and initial
 `python wordle.py <answer> -g <guess>`
 """
 
-import requests
 import argparse
+import hashlib
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+import numpy as np
 from collections import Counter
-from functools import partial
-from itertools import product
-from typing import Callable
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+from wordle_kernels import COMPILED, GREEN, GREY, YELLOW, filter_words, fill_result_table
 
 WORDLIST_URL_SCRABBLE = "https://raw.githubusercontent.com/raun/Scrabble/master/words.txt"
 WORDLIST_URL_COMMON = "https://raw.githubusercontent.com/first20hours/google-10000-english/master/google-10000-english-usa-no-swears.txt"
+CACHE_DIR = Path.home() / ".cache" / "wordle"
+CACHE_MAX_AGE = 7 * 24 * 60 * 60
+WORDARRAYS_FORMAT = 2  # bump whenever parse_wordlist or the word encoding changes
 CHARS = "abcdefghijklmnopqrstuvwxyz"
-MARKS = {"GREEN", "YELLOW", "GREY"}
+ALL_CHARS_BITS = (1 << len(CHARS)) - 1
+NUM_PREVIEW = 15
 INCONSISTENT_WORDLEN_MSG = "all words must be the same length"
+RESULT_TABLE_WORDLEN_MSG = "the result table only supports words of up to 20 letters"
+
+
+class WordArrays(NamedTuple):
+    """
+    words alongside their letters encoded as arrays, one row per word:
+    pos_mat holds the letter index (0-25) at each position,
+    count_mat holds the number of instances of each letter,
+    pos_index[position][index] holds the (sorted) rows of the words with that letter at that position and
+    word_ids maps each word to its row
+    """
+    words: tuple
+    pos_mat: np.ndarray
+    count_mat: np.ndarray
+    pos_index: list
+    word_ids: dict
 
 
 def main():
@@ -26,167 +53,463 @@ def main():
     parser = argparse.ArgumentParser(description='get Wordle answer and guess from command line')
     parser.add_argument('answer', metavar='a', type=str.lower, help='answer to the Wordle puzzle (5 letter word)')
     parser.add_argument('-g', '--guess', metavar='g', type=str.lower, default=None, help='initial guess to the puzzle')
+    parser.add_argument('-t', '--result-table', action='store_true',
+                        help='precompute the result of every word as a guess against every word as an answer')
     args = parser.parse_args()
 
     # extract command line arguments
     answer = args.answer
     guess = args.guess
+    wordlength = len(answer)
+    if guess and len(guess) != wordlength:
+        parser.error(INCONSISTENT_WORDLEN_MSG)
+    if args.result_table and result_code_dtype(wordlength) is None:
+        parser.error(RESULT_TABLE_WORDLEN_MSG)
 
     # import word lists
-    wordlength = len(answer)
-    scrabblewords = download_wordlist(WORDLIST_URL_SCRABBLE, wordlength)
+    scrabblewords = download_wordarrays(WORDLIST_URL_SCRABBLE, wordlength)
     mostcommon_ordered = download_wordlist(WORDLIST_URL_COMMON, wordlength)
+    usage_ranks = calc_usage_ranks(scrabblewords, mostcommon_ordered)
+
+    # both simulations open with the same guess, so narrow down the words for it once;
+    # filtering the survivors again for that guess in each simulation leaves them unchanged
+    candidates = None
+    if guess:
+        candidates = np.arange(len(scrabblewords.words))
+        candidates = get_possible_words(scrabblewords, candidates, guess, get_result(guess, answer))
+
+    # optionally pay up front for a table of every result so each filter becomes a single lookup
+    result_table = build_result_table(scrabblewords) if args.result_table else None
+
+    # simulate wordle solutions
+    simulate = partial(simulate_wordle, answer=answer, wordarrays=scrabblewords, guess=guess, candidates=candidates,
+                       result_table=result_table)
+    scorers = [
+        ('character position likelihood', score_by_charposition_likelihood),
+        ('word usage frequency', partial(score_by_usage_frequency, usage_ranks=usage_ranks)),
+    ]
+    for label, scorewords in scorers:
+        print(f'\nusing {label}:')
+        simulate(scorewords=scorewords)
+             
 
-    # simulate a recursive wordle solutions
-    simulate = partial(simulate_wordle, answer=answer, words=set(scrabblewords), guess=guess)
 
-    print('\nusing character position likelihood:')
-    simulate(rankwords=order_by_charposition_likelihood)
+@lru_cache(maxsize=None)
+def download_wordlist(url: str, wordlength: int) -> tuple:
+    """download words from raw text file at url; cached for the rest of the session"""
+    return parse_wordlist(download_cached(url), wordlength)
 
-    print('\nusing word usage frequency:')
-    simulate(rankwords=partial(order_by_usage_frequency, mostcommon_ordered=mostcommon_ordered))
-             
 
+@lru_cache(maxsize=None)
+def download_wordarrays(url: str, wordlength: int) -> WordArrays:
+    """
+    download words from raw text file at url and encode them, keeping the encoded letter matrix
+    in CACHE_DIR (keyed by a hash of the raw text and WORDARRAYS_FORMAT) so an unchanged word list
+    is only parsed once; the result is also cached in memory for the rest of the session
+    """
+    raw = download_cached(url)
+    cachefile = CACHE_DIR / f'{hashlib.sha256(raw).hexdigest()}-{wordlength}-v{WORDARRAYS_FORMAT}.npy'
+    if cachefile.exists():
+        try:
+            return decode_wordarrays(np.load(cachefile))
+        except (OSError, ValueError):
+            pass
+
+    wordarrays = encode_words(parse_wordlist(raw, wordlength))
+    # save to a temporary file first so an interrupted run never leaves a truncated matrix behind
+    tempfile = cachefile.with_suffix(f'.{os.getpid()}.tmp')
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(tempfile, 'wb') as f:
+            np.save(f, wordarrays.pos_mat)
+        os.replace(tempfile, cachefile)
+    except OSError:
+        tempfile.unlink(missing_ok=True)
+    return wordarrays
+
+
+def parse_wordlist(raw: bytes, wordlength: int) -> tuple:
+    """
+    get the words from raw text, decoding only the lines of the right length;
+    the words are interned since they are used repeatedly as dict keys, and
+    duplicates (e.g. from differently cased lines) are dropped keeping the first
+    """
+    wordlist = {}
+    for line in raw.split(b'\n'):
+        line = line.strip()
+        if len(line) == wordlength and line.isalpha():
+            wordlist.setdefault(sys.intern(line.decode('ascii').lower()))
+    return tuple(wordlist)
 
-def download_wordlist(url: str, wordlength: int) -> list:
-    """download words from raw text file at url"""
-    rawtext = requests.get(url).text
-    wordlist = [w.lower().strip() for w in rawtext.split('\n') if len(w)==wordlength]
-    return wordlist
+
+def download_cached(url: str) -> bytes:
+    """
+    download raw bytes from url, keeping a copy in CACHE_DIR that is reused without
+    checking the server until it is CACHE_MAX_AGE seconds old, and after that for as long
+    as the server reports it unchanged (via its ETag), cannot be reached or responds with an error
+    """
+    cachefile = CACHE_DIR / hashlib.sha256(url.encode()).hexdigest()
+    etagfile = cachefile.with_suffix('.etag')
+    cached = cachefile.exists()
+    if cached and time.time() - cachefile.stat().st_mtime < CACHE_MAX_AGE:
+        return cachefile.read_bytes()
+
+    request = urllib.request.Request(url)
+    if cached and etagfile.exists():
+        request.add_header('If-None-Match', etagfile.read_text())
+    try:
+        with urllib.request.urlopen(request) as response:
+            raw = response.read()
+            etag = response.headers.get('ETag')
+    except urllib.error.URLError as error:
+        # HTTPError is a URLError, so any error status falls back to the cached copy
+        # like a failed connection does; only a 304 confirms the copy is still current
+        if not cached:
+            raise
+        if getattr(error, 'code', None) == 304:
+            try:
+                cachefile.touch()
+            except OSError:
+                pass
+        return cachefile.read_bytes()
+
+    # the cache is only an optimization, so carry on with the download if it cannot be written
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        write_cachefile(cachefile, raw)
+        if etag:
+            write_cachefile(etagfile, etag.encode())
+    except OSError:
+        pass
+    return raw
+
+
+def write_cachefile(cachefile: Path, data: bytes):
+    """
+    write data to a temporary file first and then move it into place,
+    so an interrupted run never leaves a truncated file in the cache
+    """
+    tempfile = cachefile.with_suffix(f'{cachefile.suffix}.{os.getpid()}.tmp')
+    try:
+        tempfile.write_bytes(data)
+        os.replace(tempfile, cachefile)
+    except OSError:
+        tempfile.unlink(missing_ok=True)
+        raise
+
+
+def encode_words(words: tuple) -> WordArrays:
+    """encode words once as arrays of letter indices by position and letter counts"""
+    words = tuple(words)
+    wordlength = get_wordlength_from_set(words)
+    letters = np.frombuffer(''.join(words).encode('ascii'), dtype=np.uint8)
+    return build_wordarrays(words, letters.reshape(len(words), wordlength) - ord('a'))
 
 
-def simulate_wordle(answer: str, words: set, rankwords: Callable, guess: str=None, guessnum: int=1) -> dict:
-    """run a recursive simulation using a function to choose each successive guess"""
-    # assign best guess if no guess is provided 
-    guess = guess if guess else rankwords(words)[0]
-    assert all_same_len({guess, answer} & words), INCONSISTENT_WORDLEN_MSG
-
-    result = get_result(guess, answer)
-    words_possible = get_possible_words(words, guess, result)
-    num_words_possible = len(words_possible)
-    words_ordered = rankwords(words_possible)
-    print(guessnum, guess, num_words_possible, ', '.join(words_ordered[:15]))
-    guessnum = guessnum + 1
-    if guess == answer:
-        print(guessnum, answer)
-    else:
-        guess = words_ordered[0]
-        simulate_wordle(answer=answer, words=words_possible, rankwords=rankwords, guess=guess, guessnum=guessnum)
+def decode_wordarrays(pos_mat: np.ndarray) -> WordArrays:
+    """rebuild the encoded words from their letter-index matrix alone"""
+    wordlength = pos_mat.shape[1]
+    letters = (pos_mat + ord('a')).tobytes().decode('ascii')
+    words = tuple(sys.intern(letters[i:i+wordlength]) for i in range(0, len(letters), wordlength))
+    return build_wordarrays(words, pos_mat)
 
 
-def get_possible_words(words: set, guess: str, result: list) -> set:
-    """get set of possible words based on an initial set of words, a wordle guess, and its result"""
-    charcount_constraints = calc_charcount_constraints(guess, result)
-    position_constraints = calc_position_constraints(guess, result)
-    return {w for w in words if is_word_possible(w, charcount_constraints, position_constraints)}
+def build_wordarrays(words: tuple, pos_mat: np.ndarray) -> WordArrays:
+    """derive the letter counts and the position index of the words from their letter-index matrix"""
+    wordlength = pos_mat.shape[1]
+    count_mat = np.zeros((len(words), len(CHARS)), dtype=np.uint8)
+    np.add.at(count_mat, (np.arange(len(words))[:, None], pos_mat), 1)
+    pos_index = [[np.flatnonzero(pos_mat[:, pos] == i) for i in range(len(CHARS))] for pos in range(wordlength)]
+    word_ids = {word: i for i, word in enumerate(words)}
+    return WordArrays(words, pos_mat, count_mat, pos_index, word_ids)
 
 
-def calc_charcount_constraints(guess: str, result: list) -> dict:
+def simulate_wordle(answer: str, wordarrays: WordArrays, scorewords: Callable, guess: str=None, guessnum: int=1,
+                    candidates: np.ndarray=None, result_table: np.ndarray=None) -> list:
     """
-    get a dict of possible numbers of characters in the word based on the guess and result
-    e.g. the result {"a": {2,3,4,5}, "d": {1}, "n": {0}} 
-    means only words containing between 2 and 5 "a", 1 "d" and no "n" characters are possible
+    run a simulation using a function to score the possible words and choose each successive guess;
+    candidates holds the indices of the words in wordarrays that are still possible, and
+    scorewords is called with the word arrays, the candidates and their charposition counts.
+    if a result_table (see build_result_table) is given, it is used to filter guesses in the word list.
+    returns a list of (guessnum, guess, number of possible words) records, one per guess
+    """
+    candidates = np.arange(len(wordarrays.words)) if candidates is None else candidates
+    charposition_counts = calc_charposition_counts(wordarrays.pos_mat[candidates])
+    # assign best guess if no guess is provided 
+    if not guess:
+        guess = best_word(wordarrays, candidates, scorewords(wordarrays, candidates, charposition_counts))
+    assert wordlengths({guess, answer}) == {wordarrays.pos_mat.shape[1]}, INCONSISTENT_WORDLEN_MSG
+
+    steps = []
+    while True:
+        result = get_result(guess, answer)
+        if result_table is not None and guess in wordarrays.word_ids:
+            candidates_possible = get_possible_words_from_table(
+                result_table, candidates, wordarrays.word_ids[guess], result)
+        else:
+            candidates_possible = get_possible_words(wordarrays, candidates, guess, result)
+        # the candidates only ever shrink, so take the removed words off the counts when at least
+        # three quarters survive and otherwise just recount the survivors, since finding the
+        # removed words sorts every candidate (break-even measured at about 75% kept on 9,000 words)
+        if 4 * len(candidates_possible) >= 3 * len(candidates):
+            candidates_removed = np.setdiff1d(candidates, candidates_possible, assume_unique=True)
+            charposition_counts = charposition_counts - calc_charposition_counts(wordarrays.pos_mat[candidates_removed])
+        else:
+            charposition_counts = calc_charposition_counts(wordarrays.pos_mat[candidates_possible])
+        candidates = candidates_possible
+        scores = scorewords(wordarrays, candidates, charposition_counts)
+        # only the preview needs ordering, so take the top few rather than sorting every word
+        preview = select_words(wordarrays, top_candidates(candidates, scores, NUM_PREVIEW))
+        print(guessnum, guess, len(candidates), ', '.join(preview))
+        steps.append((guessnum, guess, len(candidates)))
+        guessnum = guessnum + 1
+        if guess == answer:
+            break
+        guess = preview[0]
+    print(guessnum, answer)
+    return steps
+
+
+def select_words(wordarrays: WordArrays, candidates: np.ndarray) -> list:
+    """get the words at the candidate indices"""
+    return [wordarrays.words[i] for i in candidates]
+
+
+def get_possible_words(wordarrays: WordArrays, candidates: np.ndarray, guess: str, result: bytes) -> np.ndarray:
+    """get indices of the candidate words that are still possible based on a wordle guess and its result"""
+    lowc, highc = calc_charcount_constraints(guess, result)
+    allowed_bits = calc_position_constraints(guess, result)
+
+    if COMPILED:
+        possible = np.empty(len(candidates), dtype=np.bool_)
+        filter_words(candidates, wordarrays.pos_mat, wordarrays.count_mat, allowed_bits, lowc, highc, possible)
+        return candidates[possible]
+
+    # narrow down to the words with each green letter in place, smallest index first, while the
+    # index is smaller than the candidates; the full check then runs on the rest. the compiled
+    # kernel checks every candidate faster than np.intersect1d sorts them, so only this path does it
+    green_indices = [wordarrays.pos_index[p][CHARS.index(g)]
+                     for p, (g, m) in enumerate(zip(guess, result)) if m == GREEN]
+    for index in sorted(green_indices, key=len):
+        if len(index) >= len(candidates):
+            break
+        candidates = np.intersect1d(candidates, index, assume_unique=True)
+
+    # filter on the cheap position check first so the charcount check only sees the survivors
+    candidates = candidates[is_position_possible(wordarrays.pos_mat[candidates], allowed_bits)]
+    return candidates[is_charcount_possible(wordarrays.count_mat[candidates], lowc, highc)]
+
+
+@lru_cache(maxsize=4096)
+def calc_charcount_constraints(guess: str, result: bytes) -> tuple:
+    """
+    get arrays of the lowest and highest possible numbers of each character (indexed 0-25)
+    in the word based on the guess and result
+    e.g. lowc[0] == 2, highc[0] == 5 means only words containing between 2 and 5 "a" are possible;
+    characters not in the guess can occur anywhere from 0 to len(guess) times.
+    the arrays are cached, so they are returned read-only
     """
     instances_guessed = Counter(guess)   
-    instances_confirmed = Counter(g for g, m in zip(guess, result) if m != "GREY")
-    
-    def get_possible_charcounts(char: str) -> set:
-        """get set of all possible numbers of letters in the word"""
-        n_guessed = instances_guessed[char]
-        n_confirmed = instances_confirmed[char]
-        n_maxpossible = n_confirmed if n_guessed > n_confirmed else len(guess)
-        return set(range(n_confirmed, n_maxpossible+1))
+    instances_confirmed = Counter(g for g, m in zip(guess, result) if m != GREY)
 
-    return {char: get_possible_charcounts(char) for char in set(guess)}
+    lowc = np.zeros(len(CHARS), dtype=np.uint8)
+    highc = np.full(len(CHARS), len(guess), dtype=np.uint8)
+    for char, n_guessed in instances_guessed.items():
+        n_confirmed = instances_confirmed[char]
+        lowc[CHARS.index(char)] = n_confirmed
+        if n_guessed > n_confirmed:
+            highc[CHARS.index(char)] = n_confirmed
+    lowc.flags.writeable = highc.flags.writeable = False
+    return lowc, highc
 
 
-def calc_position_constraints(guess: str, result: list) -> dict:
+@lru_cache(maxsize=4096)
+def calc_position_constraints(guess: str, result: bytes) -> np.ndarray:
     """
-    get a dict of possible characters at each position in the word based on the guess and result
-    e.g. the result {0: {"a", "b", "d", "e", ..., "z"}, 1: {"a"}, 2: {"g"}, 3: {"b", "c", ...}...}
+    get an array of 26-bit masks of the possible characters at each position in the word
+    based on the guess and result, where bit i is set if CHARS[i] is possible
+    e.g. the result [ALL_CHARS_BITS & ~(1 << 2), 1 << 0, 1 << 6, ...]
     means that the first character can be anything but "c", the second is "a", the third is "g"
-    and so on.
+    and so on. the array is cached, so it is returned read-only
+    """
+    allowed_bits = np.empty(len(guess), dtype=np.uint32)
+    for position, (char, mark) in enumerate(zip(guess, result)):
+        charbit = 1 << CHARS.index(char)
+        allowed_bits[position] = charbit if mark == GREEN else ALL_CHARS_BITS & ~charbit
+    allowed_bits.flags.writeable = False
+    return allowed_bits
+
+
+def is_position_possible(pos_mat: np.ndarray, allowed_bits: np.ndarray) -> np.ndarray:
+    """
+    check which words have a possible character at every position by shifting each
+    position's allowed bits down by the word's letter index; returns a boolean mask
     """
-    def get_possible_positions(position: int) -> set:
-        """get set of possible characters in a specified position"""
-        set_operation = 'intersection' if result[position]=="GREEN" else 'difference'
-        return getattr(set(CHARS), set_operation)(guess[position])
+    return ((allowed_bits >> pos_mat) & 1).all(axis=1)
 
-    return {position: get_possible_positions(position) for position in range(len(guess))}
 
+def is_charcount_possible(count_mat: np.ndarray, lowc: np.ndarray, highc: np.ndarray) -> np.ndarray:
+    """
+    check which words have a possible number of each character, given the words'
+    letter-count arrays; returns a boolean mask
+    """
+    return ((count_mat >= lowc) & (count_mat <= highc)).all(axis=1)
 
-def is_word_possible(word: str, charcount_constraints: dict, position_constraints: dict) -> bool:
+
+@lru_cache(maxsize=None)
+def get_result(guess: str, answer: str) -> bytes:
     """
-    check if word is possible based on the possible character counts and position characters
+    returns a result for a wordle guess as bytes of 5 colors, either 
+    GREEN (2), GREY (0), or YELLOW (1) to denote the result given to the guess
+    e.g. a result could be bytes([GREEN, GREY, GREY, YELLOW, GREY])
+    results are cached since they only depend on the guess and answer
     """
-    instances = Counter(word)
-    return all((
-        all(instances[c] in n for c, n in charcount_constraints.items()),
-        all(word[p] in c for p, c in position_constraints.items())
-    ))
+    if guess == answer:
+        return bytes([GREEN] * len(guess))
+
+    # first pass: assign green to exact matches and count the answer characters left unmatched
+    result = bytearray([GREY] * len(guess))
+    remaining = Counter(a for g, a in zip(guess, answer) if g != a)
+    for i, (g, a) in enumerate(zip(guess, answer)):
+        if g == a:
+            result[i] = GREEN
+
+    # second pass: assign yellow while unmatched instances of the character remain in the answer
+    for i, (g, a) in enumerate(zip(guess, answer)):
+        if g != a and remaining[g] > 0:
+            result[i] = YELLOW
+            remaining[g] -= 1
+    return bytes(result)
+
+
+def encode_result(result: bytes) -> int:
+    """encode a result as a single base-3 integer, with the first position most significant"""
+    code = 0
+    for mark in result:
+        code = code * 3 + mark
+    return code
 
 
-def get_result(guess: str, answer: str) -> str:
+def result_code_dtype(wordlength: int) -> Optional[type]:
     """
-    returns a result for a wordle guess as a list of 5 colors, either 
-    green, grey, or yellow to denote the result given to the guess
-    e.g. a result could be ["GREEN", "GREY", "GREY", "YELLOW", "GREY"] 
+    get the smallest unsigned integer type that holds every encoded result (see encode_result)
+    of words of wordlength, or None if the codes are too large for a result table
     """
-    # first pass: assign green and grey where possible; leave ambiguous cases as "_"
-    firstpass = ["GREEN" if g == a else "GREY" if g not in answer else "_"
-                   for g, a in zip(guess, answer)]
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if 3 ** wordlength - 1 <= np.iinfo(dtype).max:
+            return dtype
+    return None
+
+
+def build_result_table(wordarrays: WordArrays) -> np.ndarray:
+    """
+    get an (N, N) array of the encoded result (see encode_result) of every word as a guess (row)
+    against every word as an answer (column); this takes N * N bytes for 5 letter words
+    """
+    pos_mat = wordarrays.pos_mat
+    dtype = result_code_dtype(pos_mat.shape[1])
+    assert dtype is not None, RESULT_TABLE_WORDLEN_MSG
+    table = np.empty((len(pos_mat), len(pos_mat)), dtype=dtype)
+    if COMPILED:
+        fill_result_table(pos_mat, table)
+    else:
+        count_mat = wordarrays.count_mat.astype(np.int16)
+        for i, guess_row in enumerate(pos_mat):
+            table[i] = calc_result_codes(pos_mat, count_mat, guess_row)
+    return table
+
+
+def calc_result_codes(pos_mat: np.ndarray, count_mat: np.ndarray, guess_row: np.ndarray) -> np.ndarray:
+    """get the encoded result of one guess (as a row of letter indices) against every word at once"""
+    greens = pos_mat == guess_row
+    # count the answer characters left unmatched by the greens
+    remaining = count_mat.copy()
+    for p, g in enumerate(guess_row):
+        remaining[greens[:, p], g] -= 1
 
-    # use first pass to match with possible result candidate from the set of all permutations
-    result_permutations = set(product(MARKS, repeat=len(guess)))
-    candidate_results = {m for m in result_permutations
-        if {('GREEN','GREEN'),('GREY','GREY'),('_','GREY'),('_','YELLOW')}.issuperset(zip(firstpass, m))
-    }
+    codes = np.zeros(len(pos_mat), dtype=np.int64)
+    for p, g in enumerate(guess_row):
+        yellows = ~greens[:, p] & (remaining[:, g] > 0)
+        remaining[yellows, g] -= 1
+        codes = codes * 3 + np.where(greens[:, p], GREEN, np.where(yellows, YELLOW, GREY))
+    return codes
 
-    # finally: filter candidate results to those that are consistent with the final answer
-    ok_results = [result for result in candidate_results if answer in get_possible_words({answer}, guess, result)]
 
-    # since there can occasionally be more than one valid result, just use the first
-    return ok_results[0] # there can sometimes be more than one possible result
+def get_possible_words_from_table(result_table: np.ndarray, candidates: np.ndarray, guess_id: int,
+                                  result: bytes) -> np.ndarray:
+    """get indices of the candidate words that give the same result for the guess in the word list"""
+    return candidates[result_table[guess_id, candidates] == encode_result(result)]
 
 
-def order_by_charposition_likelihood(words: set) -> list:
+def calc_charposition_counts(pos_mat: np.ndarray) -> np.ndarray:
+    """get a (wordlength, 26) array of the number of words with each character at each position"""
+    return np.stack([np.bincount(pos_mat[:, pos], minlength=len(CHARS)) for pos in range(pos_mat.shape[1])])
+
+
+def score_by_charposition_likelihood(wordarrays: WordArrays, candidates: np.ndarray,
+                                     charposition_counts: np.ndarray) -> np.ndarray:
     """
-    order a set of words by highest "position likelihood score", i.e. where the frequencies
+    score the candidate words by "position likelihood score", i.e. where the frequencies
     of each character at each position are calculated based on the total set of possible
     words and are summed to give a score measure.
     """
-    # get a dict of letter instance fractions at each position
-    wordlength = get_wordlength_from_set(words)
-    charposition_likelihoods = {
-        (pos, char): [w[pos] for w in words].count(char) / len(words)
-        for pos in range(wordlength) for char in CHARS
-    }
+    # get a (wordlength, 26) array of letter instance fractions at each position
+    charposition_likelihoods = charposition_counts / len(candidates)
     # assume that the word with the highest sum of positional frequencies is best
-    word_scores = {
-        w: sum(charposition_likelihoods.get(k,0) for k in enumerate(w))
-        for w in words
-    }
-    ordered_words = sorted(words, key=word_scores.get, reverse=True)
-    return ordered_words
+    return score_by_position(wordarrays.pos_mat[candidates], charposition_likelihoods)
+
 
+def score_by_position(pos_mat: np.ndarray, charposition_scores: np.ndarray) -> np.ndarray:
+    """sum the (wordlength, 26) scores of each word's character at each position in one gather"""
+    return charposition_scores[np.arange(pos_mat.shape[1]), pos_mat].sum(axis=1)
 
-def order_by_usage_frequency(words: set, mostcommon_ordered: list) -> list:
+
+def score_by_usage_frequency(wordarrays: WordArrays, candidates: np.ndarray, charposition_counts: np.ndarray,
+                             usage_ranks: np.ndarray) -> np.ndarray:
     """
-    orders a set of words by most commonly used words according to a list given by
-    mostcommon_ordered. If the word in the set does not occur in the list of ordered
-    words, it is assigned an arbitrarily low ranking
+    scores the candidate words by how commonly they are used according to the usage_ranks
+    of the words (see calc_usage_ranks), where more common words score higher.
+    charposition_counts is not used but is accepted like any other scorer
     """
-    assert all(map(all_same_len, [words, mostcommon_ordered])), INCONSISTENT_WORDLEN_MSG 
-    mostcommonranks = {word: rank for rank, word in enumerate(mostcommon_ordered)}
-    return sorted(words, key=lambda x: mostcommonranks.get(x, 1e11))
+    return -usage_ranks[candidates]
 
-def wordlengths(words: set) -> set:
-    return set(map(len, words))
 
-def all_same_len(words: set) -> bool:
-    return len(wordlengths(words)) == 1
+def calc_usage_ranks(wordarrays: WordArrays, mostcommon_ordered: tuple) -> np.ndarray:
+    """
+    get an array of each word's rank in mostcommon_ordered (0 for the most common word), aligned
+    with the rows of wordarrays. If the word does not occur in the list of ordered words, it is
+    assigned an arbitrarily low ranking after all of them
+    """
+    usage_ranks = np.full(len(wordarrays.words), len(mostcommon_ordered), dtype=np.int64)
+    for rank, word in enumerate(mostcommon_ordered):
+        if word in wordarrays.word_ids:
+            usage_ranks[wordarrays.word_ids[word]] = rank
+    return usage_ranks
+
+
+def best_word(wordarrays: WordArrays, candidates: np.ndarray, scores: np.ndarray) -> str:
+    """get the highest scoring candidate word without ordering the rest"""
+    return wordarrays.words[candidates[scores.argmax()]]
+
+
+def top_candidates(candidates: np.ndarray, scores: np.ndarray, n: int) -> np.ndarray:
+    """
+    get the n highest scoring candidates, highest first, without ordering the rest;
+    ties are broken by position in the word list, so the first is the candidate best_word picks
+    """
+    top = np.arange(len(candidates))
+    if len(candidates) > n:
+        # argpartition picks arbitrarily among the scores tied at the cut, so take every score above
+        # the cut and then the earliest of those tied with it
+        cut = -np.partition(-scores, n - 1)[n - 1]
+        above = np.flatnonzero(scores > cut)
+        top = np.concatenate([above, np.flatnonzero(scores == cut)[:n - len(above)]])
+    return candidates[top[np.lexsort((top, -scores[top]))]]
+
+def wordlengths(words: tuple) -> set:
+    return set(map(len, words))
 
-def get_wordlength_from_set(words: set) -> int:
+def get_wordlength_from_set(words: tuple) -> int:
     unique_wordlengths = list(set(map(len, words)))
     assert len(unique_wordlengths)==1, "all words must have the same length"
     wordlength = unique_wordlengths[0]
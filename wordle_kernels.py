@@ -0,0 +1,97 @@
+"""
+WORDLE KERNELS
+
+Compiled inner loops for the wordle simulator in wordle.py.
+
+When numba is installed each kernel is compiled once, eagerly, for its declared signatures
+and the machine code is cached on disk, so later runs of the simulator start without compiling.
+Without numba the kernels are plain Python functions and COMPILED is False, in which case
+wordle.py uses its NumPy equivalents instead.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange, types
+except ImportError:
+    njit, prange = None, range
+
+COMPILED = njit is not None
+NUM_CHARS = 26
+GREY, YELLOW, GREEN = 0, 1, 2
+
+
+def compile_kernel(*signatures):
+    """compile a kernel for the given signatures with numba if it is installed, otherwise leave it as is"""
+    def decorator(kernel):
+        if not COMPILED:
+            return kernel
+        return njit(list(signatures), parallel=True, nogil=True, cache=True, boundscheck=False)(kernel)
+    return decorator
+
+
+def readonly(dtype: str, ndim: int):
+    """get the numba type of a C-contiguous array that the kernel does not modify"""
+    return types.Array(getattr(types, dtype), ndim, 'C', readonly=True) if COMPILED else None
+
+
+def writable(dtype: str, ndim: int):
+    """get the numba type of a C-contiguous array that the kernel writes into"""
+    return types.Array(getattr(types, dtype), ndim, 'C') if COMPILED else None
+
+
+@compile_kernel(
+    (readonly('int64', 1), readonly('uint8', 2), readonly('uint8', 2), readonly('uint32', 1),
+     readonly('uint8', 1), readonly('uint8', 1), writable('boolean', 1)),
+)
+def filter_words(candidates: np.ndarray, pos_mat: np.ndarray, count_mat: np.ndarray, allowed_bits: np.ndarray,
+                 lowc: np.ndarray, highc: np.ndarray, possible: np.ndarray):
+    """
+    check which candidate words are possible word by word, stopping at the first failed
+    position or charcount constraint, and write the boolean mask into possible
+    """
+    for i in prange(len(candidates)):
+        word = candidates[i]
+        ok = True
+        for p in range(pos_mat.shape[1]):
+            if not (allowed_bits[p] >> pos_mat[word, p]) & 1:
+                ok = False
+                break
+        if ok:
+            for c in range(count_mat.shape[1]):
+                if count_mat[word, c] < lowc[c] or count_mat[word, c] > highc[c]:
+                    ok = False
+                    break
+        possible[i] = ok
+
+
+@compile_kernel(
+    (readonly('uint8', 2), writable('uint8', 2)),
+    (readonly('uint8', 2), writable('uint16', 2)),
+    (readonly('uint8', 2), writable('uint32', 2)),
+)
+def fill_result_table(pos_mat: np.ndarray, table: np.ndarray):
+    """
+    write the encoded result of every word as a guess against every word as an answer into table,
+    using the same two passes as wordle.get_result and the base-3 code of wordle.encode_result
+    """
+    wordlength = pos_mat.shape[1]
+    for i in prange(len(pos_mat)):
+        remaining = np.zeros(NUM_CHARS, dtype=np.int64)
+        for j in range(len(pos_mat)):
+            remaining[:] = 0
+            for p in range(wordlength):
+                if pos_mat[i, p] != pos_mat[j, p]:
+                    remaining[pos_mat[j, p]] += 1
+            code = 0
+            for p in range(wordlength):
+                g = pos_mat[i, p]
+                if g == pos_mat[j, p]:
+                    mark = GREEN
+                elif remaining[g] > 0:
+                    mark = YELLOW
+                    remaining[g] -= 1
+                else:
+                    mark = GREY
+                code = code * 3 + mark
+            table[i, j] = code